@@ -1,25 +1,39 @@
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from fastapi import FastAPI, Depends, HTTPException, Header, Query
+from fastapi import FastAPI, Depends, HTTPException, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
 from fastapi.responses import StreamingResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from supabase import create_client
 from pydantic import BaseModel
+from typing import Optional
 from audio_separator.separator import Separator
-from time import sleep
+import onnxruntime as ort
+from time import sleep, monotonic
+from collections import OrderedDict
+from contextlib import contextmanager
 import yt_dlp
 import uuid
+import shutil
 import requests
 import threading
+import queue
 import asyncio
 import librosa
 import numpy as np
 import logging
+import json
+import gzip
+import hashlib
 from scipy.signal import medfilt
 
+try:
+    import brotli  # optional, enables "br" responses
+except ImportError:
+    brotli = None
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
@@ -30,6 +44,107 @@ SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
 SUPABASE_SERVICE_ROLE = os.getenv("SUPABASE_SERVICE_ROLE", "")
 
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
+# Overridable so the API can be pointed at a local stand-in (see backend/loadtest)
+YOUTUBE_API_BASE = os.getenv(
+    "YOUTUBE_API_BASE", "https://www.googleapis.com/youtube/v3").rstrip("/")
+
+# Read caches (seconds / entries). Set a TTL or size to 0 to disable that cache.
+YOUTUBE_CACHE_TTL = int(os.getenv("YOUTUBE_CACHE_TTL", "600"))
+SAVED_RESULT_CACHE_SIZE = int(os.getenv("SAVED_RESULT_CACHE_SIZE", "256"))
+
+# Responses smaller than this are not worth compressing
+COMPRESS_MIN_BYTES = 1024
+
+# ONNX runtime threads per separation job, overridable per tier with
+# SEPARATION_<TIER>_THREADS. Applied to the inference session itself.
+SEPARATION_THREADS = int(os.getenv("SEPARATION_THREADS", "4"))
+# Where separator models are downloaded/cached (audio-separator's default if unset)
+SEPARATION_MODEL_DIR = os.getenv("SEPARATION_MODEL_DIR")
+
+
+def _tier_threads(tier):
+    return int(os.getenv(f"SEPARATION_{tier.upper()}_THREADS", SEPARATION_THREADS))
+
+
+def _tier_workers(tier):
+    """
+    Concurrent separation jobs per tier, overridable with SEPARATION_WORKERS or
+    SEPARATION_<TIER>_WORKERS. Defaults to as many jobs as fit on the cores at
+    the tier's thread count. Each worker keeps its own copy of the model loaded.
+    """
+    default = os.getenv("SEPARATION_WORKERS") or max(1, (os.cpu_count() or 1) // _tier_threads(tier))
+    return max(1, int(os.getenv(f"SEPARATION_{tier.upper()}_WORKERS", default)))
+
+
+# Vocal separation quality tiers, chosen per request.
+# segment_size should match the model's dim_t (256 for these) for audio-separator
+# to run the ONNX session directly; anything else falls back to onnx2torch.
+SEPARATION_TIERS = {
+    "fast": {
+        "model": "UVR_MDXNET_9482.onnx",
+        "segment_size": 256,
+        "overlap": 0.1,
+        "batch_size": 1,
+        "enable_denoise": False,
+        "intra_op_threads": _tier_threads("fast"),
+        "inter_op_threads": 1,
+        "workers": _tier_workers("fast"),
+    },
+    "standard": {
+        "model": "UVR-MDX-NET-Voc_FT.onnx",
+        "segment_size": 256,
+        "overlap": 0.25,
+        "batch_size": 1,
+        "enable_denoise": False,
+        "intra_op_threads": _tier_threads("standard"),
+        "inter_op_threads": 1,
+        "workers": _tier_workers("standard"),
+    },
+    "high": {
+        "model": "Kim_Vocal_2.onnx",
+        "segment_size": 256,
+        "overlap": 0.5,
+        "batch_size": 1,
+        "enable_denoise": True,
+        "intra_op_threads": _tier_threads("high"),
+        "inter_op_threads": 1,
+        "workers": _tier_workers("high"),
+    },
+}
+DEFAULT_SEPARATION_TIER = os.getenv("SEPARATION_TIER", "standard")
+
+# Fast pre-check that lets already isolated vocals (a cappella, voice memos,
+# stems) skip separation. Separation is only skipped when every check passes;
+# a miss just means the track gets separated as before.
+VOCAL_DETECTION = {
+    "enabled": os.getenv("VOCAL_DETECTION", "1") != "0",
+    "sr": 22050,
+    # short windows spread over the track, so one gap-free stretch can't decide
+    "excerpts": 3,
+    "excerpt_sec": 10.0,
+    # share of spectral energy below low_cutoff_hz; bass and kick drums live here
+    "low_cutoff_hz": 80.0,
+    "max_low_ratio": 0.05,
+    # share of energy in the HPSS percussive component; drums push this up
+    "max_percussive_ratio": 0.25,
+    # gaps between phrases: frames within gap_db of the noise floor (a low RMS
+    # percentile), counted only if the loud level is min_dynamic_range_db above
+    # that floor. Measuring against the floor keeps room noise or hiss in the
+    # gaps from hiding them; mixes rarely drop to their floor at all.
+    "floor_percentile": 1,
+    "gap_db": 10.0,
+    "min_dynamic_range_db": 20.0,
+    "min_gap_fraction": 0.015,
+    # median share of chroma energy in the strongest pitch class, over frames
+    # within loud_range_db of the loud level. A single voice keeps most of it
+    # in one class; chords from guitar, piano or pads spread it over several.
+    "loud_range_db": 20.0,
+    "min_pitch_class_share": 0.45,
+}
+
+if DEFAULT_SEPARATION_TIER not in SEPARATION_TIERS:
+    raise RuntimeError(
+        f"SEPARATION_TIER must be one of {', '.join(SEPARATION_TIERS)}")
 
 if not SUPABASE_URL or not SUPABASE_ANON_KEY:
     raise RuntimeError("Set SUPABASE_URL and SUPABASE_ANON_KEY in .env")
@@ -50,6 +165,12 @@ AUDIO_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 class UrlPayload(BaseModel):
     url: str
+    # None uses DEFAULT_SEPARATION_TIER and may return an existing analysis;
+    # an explicit tier always reprocesses
+    quality: Optional[str] = None
+    # None lets the vocal detector decide and may return an existing analysis;
+    # True/False forces separation on/off and always reprocesses
+    separate: Optional[bool] = None
 
 
 supabase = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
@@ -70,6 +191,146 @@ app.mount("/files", StaticFiles(directory=str(AUDIO_OUTPUT_DIR)), name="files")
 
 progress_store = {}  # map task_id -> status string
 results_store = {}    # map task_id -> result dict
+metrics_store = {}    # map task_id -> timings/metrics dict
+
+# tier -> running totals of completed separations
+separation_stats = {tier: {"jobs": 0, "audio_sec": 0.0, "wall_sec": 0.0}
+                    for tier in SEPARATION_TIERS}
+separation_stats_lock = threading.Lock()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache. Entries expire after ttl seconds, or never if ttl
+    is None. A maxsize or ttl of 0 turns the cache into a no-op.
+    """
+
+    def __init__(self, maxsize=256, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+
+            value, expires = item
+            if expires is not None and expires < monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0 or self.ttl == 0:
+            return
+
+        expires = monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+# saved analyses never change after insert, so no TTL, only LRU eviction
+saved_result_cache = TTLCache(maxsize=SAVED_RESULT_CACHE_SIZE)  # (user, id) -> body
+youtube_details_cache = TTLCache(maxsize=512, ttl=YOUTUBE_CACHE_TTL)  # video_id -> body
+youtube_search_cache = TTLCache(maxsize=512, ttl=YOUTUBE_CACHE_TTL)  # (query, n) -> body
+
+
+def build_cached_body(payload):
+    """
+    Serialize a JSON payload once so repeat requests reuse the bytes, the
+    strong ETag and any compressed variants.
+    """
+    body = json.dumps(payload, ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+    return {
+        "body": body,
+        "etag": hashlib.sha256(body).hexdigest()[:32],
+        "encoded": {},
+    }
+
+
+def choose_encoding(accept_encoding: str, size: int):
+    """Pick br or gzip from an Accept-Encoding header, or None for identity."""
+    if size < COMPRESS_MIN_BYTES or not accept_encoding:
+        return None
+
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def encode_body(entry, encoding):
+    encoded = entry["encoded"].get(encoding)
+    if encoded is None:
+        # compressed once per cache entry, so favour ratio over speed
+        if encoding == "br":
+            encoded = brotli.compress(entry["body"], quality=9)
+        else:
+            encoded = gzip.compress(entry["body"], compresslevel=9)
+        entry["encoded"][encoding] = encoded
+    return encoded
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Weak comparison as If-None-Match requires. Compressed variants carry a
+    "-br"/"-gzip" suffix on the same base tag, so any of them matches.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/").strip('"')
+        for suffix in ("-br", "-gzip"):
+            candidate = candidate.removesuffix(suffix)
+        if candidate == etag:
+            return True
+    return False
+
+
+def cached_json_response(request: Request, entry, cache_control: str):
+    """Serve a build_cached_body entry with ETag, 304 and compression handling."""
+    encoding = choose_encoding(
+        request.headers.get("accept-encoding", ""), len(entry["body"]))
+
+    headers = {
+        "Cache-Control": cache_control,
+        "ETag": f'"{entry["etag"]}-{encoding}"' if encoding else f'"{entry["etag"]}"',
+        "Vary": "Accept-Encoding, Authorization",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), entry["etag"]):
+        return Response(status_code=304, headers=headers)
+
+    body = entry["body"]
+    if encoding:
+        body = encode_body(entry, encoding)
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 async def generate_events(task_id):
@@ -124,39 +385,50 @@ def logout():
 
 @app.post("/audio/process")
 def process_audio(payload: UrlPayload, user=Depends(verify_token)):
-    # First check if this URL was already processed for this user
-    try:
-        service_role_supabase = create_client(
-            SUPABASE_URL, SUPABASE_SERVICE_ROLE)
+    quality = payload.quality or DEFAULT_SEPARATION_TIER
+    if quality not in SEPARATION_TIERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown quality '{quality}', expected one of {', '.join(SEPARATION_TIERS)}")
+
+    # First check if this URL was already processed for this user. Saved
+    # analyses don't record the tier or separation choice they were made with,
+    # so a request that sets either always reprocesses; that is also how a
+    # wrong vocal-only guess gets redone with "separate": true.
+    if payload.quality is None and payload.separate is None:
+        try:
+            service_role_supabase = create_client(
+                SUPABASE_URL, SUPABASE_SERVICE_ROLE)
 
-        existing = service_role_supabase.table('audio_analyses').select(
-            "id, vocals_url, notes, created_at"
-        ).eq("user_id", user.id).eq("original_url", payload.url).execute()
+            existing = service_role_supabase.table('audio_analyses').select(
+                "id, vocals_url, notes, created_at"
+            ).eq("user_id", user.id).eq("original_url", payload.url).execute()
 
-        if hasattr(existing, 'data'):
-            existing_data = existing.data
-        else:
-            existing_data = existing[1] if isinstance(
-                existing, tuple) and len(existing) > 1 else []
+            if hasattr(existing, 'data'):
+                existing_data = existing.data
+            else:
+                existing_data = existing[1] if isinstance(
+                    existing, tuple) and len(existing) > 1 else []
 
-        # If exists, return the existing analysis ID immediately
-        if existing_data:
-            logger.info(
-                f"Found existing analysis for user {user.id}, URL: {payload.url}")
-            return {"task_id": "cached", "supabase_id": existing_data[0]['id']}
+            # If exists, return the existing analysis ID immediately
+            if existing_data:
+                logger.info(
+                    f"Found existing analysis for user {user.id}, URL: {payload.url}")
+                return {"task_id": "cached", "supabase_id": existing_data[0]['id']}
 
-    except Exception as e:
-        logger.warning(f"Error checking for existing analysis: {e}")
-        # Continue with processing if check fails
+        except Exception as e:
+            logger.warning(f"Error checking for existing analysis: {e}")
+            # Continue with processing if check fails
 
     # If not cached, create a new task
     task_id = str(uuid.uuid4())
     progress_store[task_id] = None
     results_store[task_id] = None
+    metrics_store[task_id] = {"quality": quality}
 
     thread = threading.Thread(
         target=process_audio_task, args=(
-            payload.url, user.id, task_id), daemon=True
+            payload.url, user.id, task_id, quality, payload.separate), daemon=True
     )
     thread.start()
     logger.info(f"Started processing task {task_id} for user {user.id}")
@@ -195,9 +467,37 @@ def audio_result(task_id: str, user=Depends(verify_token)):
     return {
         "status": "done",
         "supabase_id": supabase_id,  # Return the ID for the client to fetch the saved result
+        "metrics": metrics_store.get(task_id, {}),
     }
 
 
+@app.get("/audio/separation_tiers")
+def get_separation_tiers(user=Depends(verify_token)):
+    """
+    List the separation quality tiers with their settings and the throughput
+    observed so far, so operators can pick the CPU/quality trade-off.
+    """
+    with separation_stats_lock:
+        stats = {tier: dict(values) for tier, values in separation_stats.items()}
+
+    tiers = []
+    for name, config in SEPARATION_TIERS.items():
+        observed = stats[name]
+        tiers.append({
+            "name": name,
+            "default": name == DEFAULT_SEPARATION_TIER,
+            **config,
+            "jobs": observed["jobs"],
+            "audio_sec": round(observed["audio_sec"], 1),
+            "wall_sec": round(observed["wall_sec"], 1),
+            # seconds of audio separated per wall-clock second
+            "realtime_factor": round(observed["audio_sec"] / observed["wall_sec"], 3)
+            if observed["wall_sec"] else None,
+        })
+
+    return {"tiers": tiers}
+
+
 @app.get("/audio/sidebar_recent", dependencies=[Depends(security)])
 def get_sidebar_recent(user=Depends(verify_token), limit: int = Query(5, ge=1, le=10)):
     """Get recent analyses for the sidebar"""
@@ -235,7 +535,7 @@ def get_sidebar_recent(user=Depends(verify_token), limit: int = Query(5, ge=1, l
             # Try to get YouTube info if available
             if video_id and YOUTUBE_API_KEY:
                 try:
-                    youtube_url = "https://www.googleapis.com/youtube/v3/videos"
+                    youtube_url = f"{YOUTUBE_API_BASE}/videos"
                     params = {
                         "part": "snippet",
                         "id": video_id,
@@ -284,10 +584,16 @@ def get_sidebar_recent(user=Depends(verify_token), limit: int = Query(5, ge=1, l
 
 
 @app.get("/audio/saved_result/{analysis_id}")
-def get_saved_analysis(analysis_id: str, user=Depends(verify_token)):
+def get_saved_analysis(analysis_id: str, request: Request, user=Depends(verify_token)):
     """
     Retrieves a single saved audio analysis result from Supabase by ID.
+    Saved analyses are immutable, so they are cached per user after the first read.
     """
+    cache_key = (user.id, analysis_id)
+    entry = saved_result_cache.get(cache_key)
+    if entry is not None:
+        return cached_json_response(request, entry, "private, max-age=86400, immutable")
+
     try:
         result = supabase.table('audio_analyses').select(
             "vocals_url, notes, original_url, created_at, id"
@@ -314,13 +620,18 @@ def get_saved_analysis(analysis_id: str, user=Depends(verify_token)):
             data, list) and len(data) > 0 else data
 
         # Return as a single object, not an array
-        return {
+        entry = build_cached_body({
             "id": analysis.get("id"),
             "vocals_url": analysis.get("vocals_url"),
             "notes": analysis.get("notes", []),
             "original_url": analysis.get("original_url"),
             "created_at": analysis.get("created_at")
-        }
+        })
+        saved_result_cache.set(cache_key, entry)
+        return cached_json_response(request, entry, "private, max-age=86400, immutable")
+
+    except HTTPException:
+        raise
 
     except Exception as e:
         logger.exception(f"Error fetching saved analysis {analysis_id}: {e}")
@@ -363,21 +674,231 @@ def manual_hz_to_cents(f1, f2):
     return 1200 * np.log2(f2 / f1)
 
 
-def separate_voiceline(input_path: str, uid: str):
-    os.environ["OMP_NUM_THREADS"] = "4"
-    os.environ["UVR_THREADS"] = "4"
-    os.environ["OMP_WAIT_POLICY"] = "PASSIVE"
+def configure_onnx_session(separator, intra_op_threads: int, inter_op_threads: int):
+    """
+    Recreate the loaded MDX model's ONNX session with explicit thread counts.
+    audio-separator builds its session without thread options, and OMP/UVR
+    environment variables are ignored once onnxruntime is initialized, so this
+    is the only way to size a job. It replaces MDXSeparator.model_run, whose
+    shape is pinned by the audio-separator version in requirements.txt. Runs
+    once per loaded Separator, as checkout_separator reuses them. Returns False
+    when the model is not running on a plain ONNX session (e.g. the onnx2torch
+    fallback).
+    """
+    model = getattr(separator, "model_instance", None)
+    model_path = str(getattr(model, "model_path", ""))
+
+    if not model_path.endswith(".onnx") or getattr(model, "segment_size", None) != getattr(model, "dim_t", None):
+        logger.warning(
+            f"Separator model {model_path or '?'} is not using an ONNX session, thread settings not applied")
+        return False
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = inter_op_threads
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    # don't busy-wait between runs, the old OMP_WAIT_POLICY=PASSIVE
+    options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+    options.log_severity_level = 3
+
+    session = ort.InferenceSession(
+        model_path, sess_options=options, providers=separator.onnx_execution_provider)
+    model.model_run = lambda spek: session.run(
+        None, {"input": spek.cpu().numpy()})[0]
+    return True
+
+
+# tier -> idle Separators with the tier's model and tuned ONNX session loaded.
+# Reused across jobs so each model is loaded once per worker, not once per job.
+separator_pools = {tier: queue.LifoQueue() for tier in SEPARATION_TIERS}
+# A Separator is not safe to share between threads, so each job checks one out.
+# The slots cap a tier at its "workers" concurrent jobs, which also caps how
+# many copies of its model get loaded.
+separator_slots = {tier: threading.BoundedSemaphore(config["workers"])
+                   for tier, config in SEPARATION_TIERS.items()}
+# Separator output lands here, then moves to the user's folder under AUDIO_OUTPUT_DIR
+SEPARATION_WORK_DIR = BASE_DIR / "audio_separating"
+
+
+def load_separator(tier: str, output_dir):
+    """Build a vocals-only Separator for a quality tier, ready to separate."""
+    config = SEPARATION_TIERS[tier]
+
+    kwargs = {}
+    if SEPARATION_MODEL_DIR:
+        kwargs["model_file_dir"] = SEPARATION_MODEL_DIR
+
+    separator = Separator(
+        output_dir=str(output_dir),
+        output_format="mp3",
+        output_single_stem="vocals",
+        mdx_params={
+            "hop_length": 1024,
+            "segment_size": config["segment_size"],
+            "overlap": config["overlap"],
+            "batch_size": config["batch_size"],
+            "enable_denoise": config["enable_denoise"],
+        },
+        **kwargs,
+    )
+    separator.load_model(config["model"])
+    configure_onnx_session(
+        separator, config["intra_op_threads"], config["inter_op_threads"])
+    return separator
+
+
+@contextmanager
+def checkout_separator(tier: str):
+    """
+    Borrow an idle Separator for a tier, waiting for a free slot and loading
+    a new one if every loaded Separator is busy. It goes back to the pool on exit.
+    """
+    with separator_slots[tier]:
+        try:
+            separator = separator_pools[tier].get_nowait()
+        except queue.Empty:
+            work_dir = SEPARATION_WORK_DIR / tier
+            os.makedirs(work_dir, exist_ok=True)
+            separator = load_separator(tier, work_dir)
+        try:
+            yield separator
+        finally:
+            separator_pools[tier].put(separator)
+
+
+def record_separation_stats(tier: str, audio_sec: float, wall_sec: float):
+    with separation_stats_lock:
+        stats = separation_stats[tier]
+        stats["jobs"] += 1
+        stats["audio_sec"] += audio_sec
+        stats["wall_sec"] += wall_sec
+
+
+def detect_vocal_only(input_path: str):
+    """
+    Estimate whether a file is already vocal-only from a few short, downsampled
+    excerpts spread over the track. Returns a dict with the features and
+    "vocal_only", which needs every check to pass: little energy below the low
+    cutoff (bass, kick), a small percussive share (drums), gaps that drop to
+    the noise floor (accompaniment fills them) and chroma concentrated in one
+    pitch class (chords).
+    """
+    config = VOCAL_DETECTION
+    start = monotonic()
+
+    duration = librosa.get_duration(path=input_path)
+    excerpt = min(config["excerpt_sec"], duration / config["excerpts"])
+
+    spectra = []
+    for i in range(config["excerpts"]):
+        centre = duration * (2 * i + 1) / (2 * config["excerpts"])
+        y, sr = librosa.load(input_path, sr=config["sr"], mono=True,
+                             offset=max(0.0, centre - excerpt / 2), duration=excerpt)
+        if len(y):
+            spectra.append(librosa.stft(y, n_fft=2048, hop_length=512))
+
+    if not spectra or not any(np.any(D) for D in spectra):
+        return {"vocal_only": False, "reason": "silent excerpt",
+                "detection_sec": round(monotonic() - start, 3)}
+
+    D = np.hstack(spectra)
+    power = np.abs(D) ** 2
+    total = power.sum() + 1e-12
+
+    freqs = librosa.fft_frequencies(sr=sr, n_fft=2048)
+    low_ratio = power[freqs < config["low_cutoff_hz"]].sum() / total
+
+    harmonic, percussive = librosa.decompose.hpss(D)
+    h_energy = (np.abs(harmonic) ** 2).sum()
+    p_energy = (np.abs(percussive) ** 2).sum()
+    percussive_ratio = p_energy / (h_energy + p_energy + 1e-12)
+
+    rms_db = librosa.amplitude_to_db(
+        librosa.feature.rms(S=np.abs(D), frame_length=2048)[0], ref=1.0)
+    loud_level = np.percentile(rms_db, 95)
+    noise_floor = np.percentile(rms_db, config["floor_percentile"])
+    dynamic_range = loud_level - noise_floor
+    gap_fraction = 0.0
+    if dynamic_range >= config["min_dynamic_range_db"]:
+        gap_fraction = np.mean(rms_db < noise_floor + config["gap_db"])
+
+    chroma = librosa.feature.chroma_stft(S=power, sr=sr, n_fft=2048, norm=None)
+    loud = chroma[:, rms_db > loud_level - config["loud_range_db"]]
+    pitch_class_share = np.median(loud.max(axis=0) / (loud.sum(axis=0) + 1e-12))
+
+    checks = {
+        "low_ratio": bool(low_ratio <= config["max_low_ratio"]),
+        "percussive_ratio": bool(percussive_ratio <= config["max_percussive_ratio"]),
+        "gap_fraction": bool(gap_fraction >= config["min_gap_fraction"]),
+        "pitch_class_share": bool(pitch_class_share >= config["min_pitch_class_share"]),
+    }
+
+    return {
+        "vocal_only": all(checks.values()),
+        "low_ratio": round(float(low_ratio), 4),
+        "percussive_ratio": round(float(percussive_ratio), 4),
+        "dynamic_range_db": round(float(dynamic_range), 1),
+        "gap_fraction": round(float(gap_fraction), 4),
+        "pitch_class_share": round(float(pitch_class_share), 4),
+        "checks": checks,
+        "excerpt_sec": round(excerpt * len(spectra), 2),
+        "detection_sec": round(monotonic() - start, 3),
+    }
 
+
+def analyze_isolated_vocals(input_path: str, uid: str):
+    """
+    Skip-separation path: the input already is the vocal line, so move it to
+    where separated vocals are served from and analyze it directly.
+    """
     output_dir = AUDIO_OUTPUT_DIR / uid
     os.makedirs(output_dir, exist_ok=True)
 
-    separator = Separator(output_dir=str(output_dir),
-                          output_format="mp3", output_single_stem="vocals")
-    model_name = "UVR-MDX-NET-Voc_FT.onnx"
+    vocals_path = output_dir / (str(uuid.uuid4()) + Path(input_path).suffix)
+    try:
+        shutil.move(input_path, vocals_path)
+    except OSError as e:
+        logger.exception(
+            f"Error moving file: {e}. Source: '{input_path}' -> Destination: '{vocals_path}'")
+        return {"status": "error", "vocals_path": None, "notes": []}
+
+    start = monotonic()
+    notes = get_segmented_vocal_notes(str(vocals_path), cents_tolerance=50)
+
+    return {
+        "status": "done",
+        "vocals_path": str(vocals_path),
+        "notes": notes,
+        "metrics": {"analysis_sec": round(monotonic() - start, 2)}
+    }
+
+
+def separate_voiceline(input_path: str, uid: str, quality: str = DEFAULT_SEPARATION_TIER):
+    output_dir = AUDIO_OUTPUT_DIR / uid
+    os.makedirs(output_dir, exist_ok=True)
+    work_dir = SEPARATION_WORK_DIR / quality
 
-    separator.load_model(model_name)
+    with checkout_separator(quality) as separator:
+        start = monotonic()
+        result_paths = separator.separate(input_path)
+        separation_sec = monotonic() - start
 
-    result_paths = separator.separate(input_path)
+    try:
+        audio_sec = librosa.get_duration(path=input_path)
+    except Exception as e:
+        logger.warning(f"Could not read duration of {input_path}: {e}")
+        audio_sec = 0.0
+
+    record_separation_stats(quality, audio_sec, separation_sec)
+    metrics = {
+        "quality": quality,
+        "model": SEPARATION_TIERS[quality]["model"],
+        "audio_sec": round(audio_sec, 2),
+        "separation_sec": round(separation_sec, 2),
+        "realtime_factor": round(audio_sec / separation_sec, 3) if separation_sec else None,
+    }
+    logger.info(
+        f"Separated {audio_sec:.1f}s of audio with tier '{quality}' in {separation_sec:.1f}s")
 
     vocals_path = result_paths[0] if result_paths else None
 
@@ -388,13 +909,13 @@ def separate_voiceline(input_path: str, uid: str):
         actual_file_path = None
         try:
             # find the actual output file created by separator
-            actual_file_path = next(output_dir.glob(f"{filename_uuid}*"))
+            actual_file_path = next(work_dir.glob(f"{filename_uuid}*"))
         except StopIteration:
             logger.error(
-                f"Could not find any output file starting with {filename_uuid} in {output_dir}")
+                f"Could not find any output file starting with {filename_uuid} in {work_dir}")
             return {"status": "error", "vocals_path": None, "notes": []}
 
-        new_path = actual_file_path.parent / (filename_uuid + ".mp3")
+        new_path = output_dir / (filename_uuid + ".mp3")
 
         if new_path.exists():
             try:
@@ -403,22 +924,25 @@ def separate_voiceline(input_path: str, uid: str):
                 logger.warning(f"Could not remove existing file {new_path}")
 
         try:
-            os.rename(actual_file_path, new_path)
+            shutil.move(actual_file_path, new_path)
             vocals_path = str(new_path)
         except OSError as e:
             logger.exception(
-                f"Error renaming file: {e}. Source: '{actual_file_path}' -> Destination: '{new_path}'")
+                f"Error moving file: {e}. Source: '{actual_file_path}' -> Destination: '{new_path}'")
             return {"status": "error", "vocals_path": None, "notes": []}
     else:
         return {"status": "error", "vocals_path": None, "notes": []}
 
+    start = monotonic()
     notes = get_segmented_vocal_notes(
         vocals_path, cents_tolerance=50) if vocals_path else []
+    metrics["analysis_sec"] = round(monotonic() - start, 2)
 
     return {
         "status": "done",
         "vocals_path": vocals_path,
-        "notes": notes
+        "notes": notes,
+        "metrics": metrics
     }
 
 # --- UPDATED FUNCTION: SAVE TO SUPABASE ---
@@ -472,20 +996,48 @@ def save_analysis_to_supabase(uid: str, original_url: str, vocals_path: str, not
 # --- UPDATED FUNCTION: process_audio_task ---
 
 
-def process_audio_task(input_path, uid, task_id):
+def process_audio_task(input_path, uid, task_id, quality=DEFAULT_SEPARATION_TIER, separate=None):
     """
     Handles downloading, separating, analyzing, and SAVING to Supabase.
+    separate=None lets the vocal detector skip separation for vocal-only input.
     """
+    metrics = metrics_store.setdefault(task_id, {"quality": quality})
     try:
         progress_store[task_id] = "downloading"
+        start = monotonic()
         file_path = download_audio(input_path, uid)
+        metrics["download_sec"] = round(monotonic() - start, 2)
 
         progress_store[task_id] = "separating"
+
+        if separate is None and VOCAL_DETECTION["enabled"]:
+            try:
+                detection = detect_vocal_only(file_path)
+            except Exception as e:
+                logger.warning(f"Vocal detection failed for task {task_id}: {e}")
+                detection = {"vocal_only": False, "reason": str(e)}
+            metrics["vocal_detection"] = detection
+            separate = not detection["vocal_only"]
+            metrics["separation_decision"] = "detector"
+        elif separate is None:
+            separate = True
+            metrics["separation_decision"] = "default"
+        else:
+            metrics["separation_decision"] = "override"
+
+        metrics["separation_path"] = "separated" if separate else "skipped"
+        logger.info(
+            f"Task {task_id}: separation {metrics['separation_path']} ({metrics['separation_decision']})")
+
         # The result dict now contains the raw vocals_path and notes
-        analysis_result = separate_voiceline(file_path, uid)
+        if separate:
+            analysis_result = separate_voiceline(file_path, uid, quality)
+        else:
+            analysis_result = analyze_isolated_vocals(file_path, uid)
 
         vocals_path = analysis_result.get("vocals_path")
         notes = analysis_result.get("notes", [])
+        metrics.update(analysis_result.get("metrics", {}))
 
         if not vocals_path:
             raise Exception("Separation failed, no vocal file created.")
@@ -680,10 +1232,15 @@ def get_segmented_vocal_notes(audio_path, min_duration_sec=0.08, sr=44100, frame
 
 @app.get("/youtube/details", dependencies=[Depends(security)])
 def get_video_details(
+    request: Request,
     video_id: str = Query(..., min_length=11, max_length=11),
 ):
+    entry = youtube_details_cache.get(video_id)
+    if entry is not None:
+        return cached_json_response(request, entry, f"private, max-age={YOUTUBE_CACHE_TTL}")
+
     try:
-        url = "https://www.googleapis.com/youtube/v3/videos"
+        url = f"{YOUTUBE_API_BASE}/videos"
         params = {
             "part": "snippet,contentDetails",
             "id": video_id,
@@ -711,7 +1268,9 @@ def get_video_details(
                 "duration": item['contentDetails']['duration'],
             }
 
-            return details
+            entry = build_cached_body(details)
+            youtube_details_cache.set(video_id, entry)
+            return cached_json_response(request, entry, f"private, max-age={YOUTUBE_CACHE_TTL}")
 
         raise HTTPException(status_code=404, detail="Video not found")
 
@@ -722,11 +1281,17 @@ def get_video_details(
 
 @app.get("/youtube/search", dependencies=[Depends(security)])
 def search_videos(
+    request: Request,
     query: str = Query(..., min_length=3),
     max_results: int = 3
 ):
+    cache_key = (query.strip().lower(), max_results)
+    entry = youtube_search_cache.get(cache_key)
+    if entry is not None:
+        return cached_json_response(request, entry, f"private, max-age={YOUTUBE_CACHE_TTL}")
+
     try:
-        url = "https://www.googleapis.com/youtube/v3/search"
+        url = f"{YOUTUBE_API_BASE}/search"
         params = {
             "part": "snippet",
             "q": query,
@@ -747,7 +1312,9 @@ def search_videos(
                     "thumbnail": item['snippet']['thumbnails']['default']['url'],
                 })
 
-        return {"results": results}
+        entry = build_cached_body({"results": results})
+        youtube_search_cache.set(cache_key, entry)
+        return cached_json_response(request, entry, f"private, max-age={YOUTUBE_CACHE_TTL}")
 
     except requests.exceptions.RequestException as e:
         logger.exception(f"YouTube API Error: {e}")
@@ -0,0 +1,391 @@
+"""
+Offline benchmark for the analysis pipeline in app/main.py.
+
+Measures wall time, memory and throughput of each stage (audio load,
+vocal-only detection, pitch tracking, note segmentation, cents conversion
+and, optionally, vocal separation) against synthetic fixtures and any real
+stems passed on the command line. The detect stage also runs on mixture
+fixtures (the same voice over bass, drums or chords), which it must not call
+vocal-only. Each measurement runs in a fresh process, and memory is reported
+as the growth of peak RSS during the stage, so import footprints do not
+count. Results are written as JSON for compare.py.
+
+    python bench_pipeline.py
+    python bench_pipeline.py --fixtures 30s,4min,60min --stems my_vocals.wav
+    python bench_pipeline.py --stages separation --separation-tiers fast,standard --model-dir ~/uvr-models
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+APP_DIR = BENCH_DIR.parent / "app"
+RESULTS_DIR = BENCH_DIR / "results"
+
+sys.path.insert(0, str(BENCH_DIR))
+
+from fixtures import ACCOMPANIMENTS, FIXTURE_LENGTHS, DEFAULT_FIXTURE_DIR, get_fixture, get_stem  # noqa: E402
+
+ALL_STAGES = ["load", "detect", "pitch", "segmentation", "cents", "separation"]
+DEFAULT_STAGES = ["load", "detect", "pitch", "segmentation", "cents"]
+DEFAULT_FIXTURES = ["30s", "4min"]
+
+# Pitch trackers to time in isolation, with the parameters main.py uses
+PITCH_ENGINES = {
+    "pyin": {"fmin": 100, "fmax": 1100, "frame_length": 1024, "hop_length": 128},
+}
+
+# get_segmented_vocal_notes configurations worth tracking separately
+SEGMENTATION_ENGINES = {
+    # the call separate_voiceline and analyze_isolated_vocals make. It leaves
+    # merge_all_until_silence on, so notes only split on silence and
+    # cents_tolerance has no effect
+    "production": {"cents_tolerance": 50},
+    # not used in production: split notes on pitch changes as well, to track
+    # what turning merge_all_until_silence off would cost
+    "pitch_split": {"cents_tolerance": 50, "merge_all_until_silence": False},
+}
+
+CENTS_CALLS = 200_000
+
+# Stages that call into app/main.py. The others only need librosa, so they
+# skip importing main (and with it audio_separator, onnxruntime, yt_dlp...).
+MAIN_STAGES = {"detect", "segmentation", "cents", "separation"}
+
+
+def import_main():
+    """
+    Import app/main.py without a live backend. Placeholder credentials are
+    only used when the real ones are not already in the environment; nothing
+    in the benchmarked code paths talks to Supabase or YouTube.
+    """
+    os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+    os.environ.setdefault("SUPABASE_ANON_KEY", "bench.placeholder.key")
+    os.environ.setdefault("YOUTUBE_API_KEY", "bench-placeholder")
+
+    if str(APP_DIR) not in sys.path:
+        sys.path.insert(0, str(APP_DIR))
+
+    import main
+    return main
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        # Windows has no resource module
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def _run_case(stage, engine, audio_path, options):
+    """Runs in a child process. Returns timing and memory for one repeat."""
+    import librosa
+    import numpy as np
+
+    main = None
+    if stage in MAIN_STAGES:
+        if options.get("model_dir"):
+            os.environ["SEPARATION_MODEL_DIR"] = options["model_dir"]
+        main = import_main()
+    extra = {}
+
+    if stage == "load":
+        rss_before = _peak_rss_mb()
+        start = time.perf_counter()
+        y, _ = librosa.load(audio_path, sr=44100, mono=True)
+        wall = time.perf_counter() - start
+        extra["samples"] = int(len(y))
+
+    elif stage == "detect":
+        rss_before = _peak_rss_mb()
+        start = time.perf_counter()
+        detection = main.detect_vocal_only(audio_path)
+        wall = time.perf_counter() - start
+        extra["vocal_only"] = detection["vocal_only"]
+
+    elif stage == "pitch":
+        y, sr = librosa.load(audio_path, sr=44100, mono=True)
+        params = PITCH_ENGINES[engine]
+        rss_before = _peak_rss_mb()
+        start = time.perf_counter()
+        f0, _, _ = librosa.pyin(y, sr=sr, **params)
+        wall = time.perf_counter() - start
+        extra["frames"] = int(len(f0))
+
+    elif stage == "segmentation":
+        rss_before = _peak_rss_mb()
+        start = time.perf_counter()
+        notes = main.get_segmented_vocal_notes(
+            audio_path, **SEGMENTATION_ENGINES[engine])
+        wall = time.perf_counter() - start
+        extra["notes"] = len(notes)
+
+    elif stage == "cents":
+        rng = np.random.default_rng(0)
+        f1 = rng.uniform(80, 1100, CENTS_CALLS)
+        f2 = rng.uniform(80, 1100, CENTS_CALLS)
+        # a few unvoiced frames, like real pyin output
+        f1[::20] = 0.0
+        rss_before = _peak_rss_mb()
+        start = time.perf_counter()
+        for a, b in zip(f1, f2):
+            main.manual_hz_to_cents(a, b)
+        wall = time.perf_counter() - start
+        extra["calls"] = CENTS_CALLS
+
+    elif stage == "separation":
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as out_dir:
+            main.SEPARATION_WORK_DIR = Path(out_dir)
+            # engine is a quality tier; checkout_separator applies its model,
+            # MDX parameters and ONNX thread counts exactly as a job would.
+            # A fresh process has an empty pool, so this is the first-job load.
+            load_start = time.perf_counter()
+            with main.checkout_separator(engine) as separator:
+                extra["model_load_sec"] = round(
+                    time.perf_counter() - load_start, 4)
+
+                rss_before = _peak_rss_mb()
+                start = time.perf_counter()
+                separator.separate(audio_path)
+                wall = time.perf_counter() - start
+
+    else:
+        raise ValueError(f"Unknown stage '{stage}'")
+
+    peak = _peak_rss_mb()
+    return {
+        "wall_sec": wall,
+        "rss_before_mb": rss_before,
+        "peak_rss_mb": peak,
+        # how far the stage itself pushed the peak past what was already resident
+        "stage_rss_mb": peak - rss_before if peak is not None else None,
+        **extra,
+    }
+
+
+def _engines_for(stage, options):
+    if stage == "pitch":
+        return list(PITCH_ENGINES)
+    if stage == "segmentation":
+        return list(SEGMENTATION_ENGINES)
+    if stage == "separation":
+        return options["separation_tiers"]
+    return ["default"]
+
+
+def run_benchmark(stage, engine, audio_path, audio_meta, repeat, options):
+    """Run one (stage, engine, input) case `repeat` times in fresh processes."""
+    runs = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            runs.append(pool.submit(
+                _run_case, stage, engine, audio_path, options).result())
+
+    walls = [r["wall_sec"] for r in runs]
+    wall = statistics.median(walls)
+    peaks = [r["peak_rss_mb"] for r in runs if r["peak_rss_mb"] is not None]
+    befores = [r["rss_before_mb"]
+               for r in runs if r["rss_before_mb"] is not None]
+    growths = [r["stage_rss_mb"]
+               for r in runs if r["stage_rss_mb"] is not None]
+
+    result = {
+        "stage": stage,
+        "engine": engine,
+        "input": audio_meta["name"] if audio_meta else None,
+        "input_kind": audio_meta["kind"] if audio_meta else None,
+        "audio_sec": audio_meta["duration_sec"] if audio_meta else None,
+        "repeat": repeat,
+        "wall_sec": round(wall, 4),
+        "wall_sec_min": round(min(walls), 4),
+        "wall_sec_runs": [round(w, 4) for w in walls],
+        "peak_rss_mb": round(max(peaks), 1) if peaks else None,
+        "rss_before_mb": round(min(befores), 1) if befores else None,
+        "stage_rss_mb": round(statistics.median(growths), 1) if growths else None,
+        "realtime_factor": None,
+        "notes": None,
+        "notes_per_sec": None,
+    }
+
+    if audio_meta and wall > 0:
+        result["realtime_factor"] = round(audio_meta["duration_sec"] / wall, 3)
+
+    last = runs[-1]
+    if "notes" in last:
+        result["notes"] = last["notes"]
+        result["notes_per_sec"] = round(last["notes"] / wall, 2) if wall > 0 else None
+    if "calls" in last:
+        result["calls_per_sec"] = round(last["calls"] / wall, 1) if wall > 0 else None
+    if "frames" in last:
+        result["frames_per_sec"] = round(last["frames"] / wall, 1) if wall > 0 else None
+    if "vocal_only" in last:
+        result["vocal_only"] = last["vocal_only"]
+        # synthetic fixtures are isolated vocals unless mixed over an
+        # accompaniment; real stems are whatever the user passed, so they
+        # have no expected verdict
+        synthetic = audio_meta and audio_meta["kind"] == "synthetic"
+        result["vocal_only_expected"] = (
+            audio_meta.get("accompaniment") is None if synthetic else None)
+    if "model_load_sec" in last:
+        result["model_load_sec"] = last["model_load_sec"]
+
+    return result
+
+
+def _misdetected(result):
+    expected = result.get("vocal_only_expected")
+    return expected is not None and result.get("vocal_only") != expected
+
+
+def _git_info():
+    def git(*args):
+        try:
+            return subprocess.check_output(
+                ["git", *args], cwd=BENCH_DIR, stderr=subprocess.DEVNULL, text=True).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain")
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+    }
+
+
+def _versions():
+    versions = {}
+    for name in ("numpy", "scipy", "librosa", "soundfile", "audio_separator", "onnxruntime"):
+        try:
+            module = __import__(name)
+            versions[name] = getattr(module, "__version__", "unknown")
+        except ImportError:
+            versions[name] = None
+    return versions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", default=",".join(DEFAULT_FIXTURES),
+                        help=f"comma separated synthetic fixtures, any of {','.join(FIXTURE_LENGTHS)}"
+                        " (empty string for none)")
+    parser.add_argument("--mixtures", default=",".join(ACCOMPANIMENTS),
+                        help="comma separated accompaniments mixed under each fixture for the detect stage,"
+                        f" any of {','.join(ACCOMPANIMENTS)} (empty string for none)")
+    parser.add_argument("--stems", nargs="*", default=[],
+                        help="real vocal stems to benchmark alongside the fixtures")
+    parser.add_argument("--stages", default=",".join(DEFAULT_STAGES),
+                        help=f"comma separated stages, any of {','.join(ALL_STAGES)}")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="fresh-process repeats per case; the median is reported")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed for the synthetic fixtures")
+    parser.add_argument("--fixture-dir", default=str(DEFAULT_FIXTURE_DIR),
+                        help="where generated fixtures are cached")
+    parser.add_argument("--separation-tiers", default="fast,standard,high",
+                        help="comma separated quality tiers (SEPARATION_TIERS in main.py) for the separation stage")
+    parser.add_argument("--model-dir", default=None,
+                        help="directory holding already downloaded separator models")
+    parser.add_argument("--output", default=None,
+                        help="JSON output path (default: results/<timestamp>_<commit>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = set(stages) - set(ALL_STAGES)
+    if unknown:
+        raise SystemExit(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    inputs = []
+    mixtures = []
+    for name in [f for f in args.fixtures.split(",") if f]:
+        print(f"Preparing fixture {name}...", flush=True)
+        inputs.append(get_fixture(name, args.fixture_dir, seed=args.seed))
+        if "detect" in stages:
+            for accompaniment in [a for a in args.mixtures.split(",") if a]:
+                mixtures.append(get_fixture(
+                    name, args.fixture_dir, seed=args.seed, accompaniment=accompaniment))
+    for stem in args.stems:
+        inputs.append(get_stem(stem))
+
+    options = {
+        "separation_tiers": [t for t in args.separation_tiers.split(",") if t],
+        "model_dir": args.model_dir,
+    }
+
+    results = []
+    for stage in stages:
+        for engine in _engines_for(stage, options):
+            # cents conversion does not read audio, time it once; mixtures are
+            # only there to check the detector's verdict
+            if stage == "cents":
+                stage_inputs = [(None, None)]
+            elif stage == "detect":
+                stage_inputs = inputs + mixtures
+            else:
+                stage_inputs = inputs
+            for audio_path, audio_meta in stage_inputs:
+                label = audio_meta["name"] if audio_meta else "-"
+                print(f"{stage:<13} {engine:<24} {label:<12}", end=" ", flush=True)
+                result = run_benchmark(
+                    stage, engine, str(audio_path) if audio_path else None,
+                    audio_meta, args.repeat, options)
+                results.append(result)
+                print(f"{result['wall_sec']:>9.3f}s  stage +{result['stage_rss_mb']} MB"
+                      + (f"  {result['notes_per_sec']} notes/s" if result["notes_per_sec"] else "")
+                      + ("  MISDETECTED" if _misdetected(result) else ""))
+
+    git = _git_info()
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git": git,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": _versions(),
+        "inputs": [meta for _, meta in inputs + mixtures],
+        "results": results,
+    }
+
+    if args.output:
+        output = Path(args.output)
+    else:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        commit = (git["commit"] or "nogit")[:8]
+        output = RESULTS_DIR / f"{stamp}_{commit}.json"
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Saved {len(results)} results to {output}")
+
+    misdetected = [r for r in results if _misdetected(r)]
+    if misdetected:
+        names = ", ".join(r["input"] for r in misdetected)
+        print(f"detect_vocal_only got the wrong verdict for: {names}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
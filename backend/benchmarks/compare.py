@@ -0,0 +1,136 @@
+"""
+Compare two bench_pipeline.py result files and flag regressions.
+
+    python compare.py results/before.json results/after.json
+    python compare.py before.json after.json --threshold 0.15
+
+Exits with status 1 when any case got slower, or its stage memory growth
+(stage_rss_mb, peak RSS during the stage minus RSS before it) grew, by more
+than the threshold allows, or when the vocal-only detector got a synthetic
+fixture wrong (including cases only the candidate has), so it can gate a CI job.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _key(result):
+    return (result["stage"], result["engine"], result["input"])
+
+
+def _load(path):
+    report = json.loads(Path(path).read_text())
+    return report, {_key(r): r for r in report["results"]}
+
+
+def _misdetected(result):
+    expected = result.get("vocal_only_expected")
+    return expected is not None and result.get("vocal_only") != expected
+
+
+def _ratio(new, old):
+    if new is None or old is None or old == 0:
+        return None
+    return new / old
+
+
+def compare(baseline, candidate, threshold=0.10, rss_threshold=0.20, min_wall=0.05, min_rss=10.0):
+    """
+    Return a list of row dicts, one per case present in both reports.
+    Cases whose baseline wall time is below min_wall seconds, or whose memory
+    growth changed by less than min_rss MB, are reported but not flagged, as
+    they are dominated by noise.
+    """
+    rows = []
+    for key in sorted(baseline.keys() & candidate.keys(), key=lambda k: tuple(str(p) for p in k)):
+        old, new = baseline[key], candidate[key]
+        wall_ratio = _ratio(new["wall_sec"], old["wall_sec"])
+        old_rss, new_rss = old.get("stage_rss_mb"), new.get("stage_rss_mb")
+        rss_ratio = _ratio(new_rss, old_rss)
+
+        flags = []
+        if wall_ratio is not None and old["wall_sec"] >= min_wall and wall_ratio > 1 + threshold:
+            flags.append("SLOWER")
+        if (old_rss is not None and new_rss is not None and new_rss - old_rss >= min_rss
+                and (rss_ratio is None or rss_ratio > 1 + rss_threshold)):
+            flags.append("MORE RSS")
+        if old.get("notes") is not None and new.get("notes") != old.get("notes"):
+            # not a perf regression, but output changed and timings may not be comparable
+            flags.append("NOTES CHANGED")
+        if _misdetected(new):
+            flags.append("MISDETECTED")
+
+        rows.append({
+            "key": key,
+            "old_wall": old["wall_sec"],
+            "new_wall": new["wall_sec"],
+            "wall_ratio": wall_ratio,
+            "old_rss": old_rss,
+            "new_rss": new_rss,
+            "rss_ratio": rss_ratio,
+            "flags": flags,
+        })
+    return rows
+
+
+def _fmt_ratio(ratio):
+    return f"{(ratio - 1) * 100:+6.1f}%" if ratio is not None else "     -"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed wall time increase, as a fraction (default 0.10)")
+    parser.add_argument("--rss-threshold", type=float, default=0.20,
+                        help="allowed stage memory growth increase, as a fraction (default 0.20)")
+    parser.add_argument("--min-rss", type=float, default=10.0,
+                        help="ignore memory increases smaller than this many MB")
+    parser.add_argument("--min-wall", type=float, default=0.05,
+                        help="ignore slowdowns of cases faster than this many seconds")
+    args = parser.parse_args(argv)
+
+    base_report, baseline = _load(args.baseline)
+    cand_report, candidate = _load(args.candidate)
+
+    print(f"baseline:  {base_report['git'].get('commit')}  ({args.baseline})")
+    print(f"candidate: {cand_report['git'].get('commit')}  ({args.candidate})")
+    if base_report.get("platform") != cand_report.get("platform"):
+        print("warning: results were recorded on different platforms")
+
+    rows = compare(baseline, candidate, args.threshold, args.rss_threshold, args.min_wall, args.min_rss)
+
+    print(f"\n{'stage':<13} {'engine':<24} {'input':<12} {'old s':>9} {'new s':>9} {'wall':>7} {'rss':>7}")
+    for row in rows:
+        stage, engine, audio = row["key"]
+        print(f"{stage:<13} {engine:<24} {str(audio or '-'):<12} "
+              f"{row['old_wall']:>9.3f} {row['new_wall']:>9.3f} "
+              f"{_fmt_ratio(row['wall_ratio'])} {_fmt_ratio(row['rss_ratio'])}  "
+              f"{' '.join(row['flags'])}")
+
+    only_old = baseline.keys() - candidate.keys()
+    only_new = candidate.keys() - baseline.keys()
+    if only_old:
+        print(f"\n{len(only_old)} case(s) only in baseline")
+    if only_new:
+        print(f"{len(only_new)} case(s) only in candidate")
+
+    # new cases have nothing to be slower than, but their verdicts still count
+    new_misdetected = [k for k in only_new if _misdetected(candidate[k])]
+    for stage, engine, audio in sorted(new_misdetected, key=lambda k: tuple(str(p) for p in k)):
+        print(f"{stage:<13} {engine:<24} {str(audio or '-'):<12} (candidate only)  MISDETECTED")
+
+    regressions = [r for r in rows if {"SLOWER", "MORE RSS", "MISDETECTED"} & set(r["flags"])]
+    regressions += new_misdetected
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) found")
+        return 1
+
+    print("\nno regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
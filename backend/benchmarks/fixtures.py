@@ -0,0 +1,255 @@
+"""
+Synthetic vocal-like fixtures for the benchmark suite.
+
+Every fixture is generated deterministically from a seed, so two runs on two
+different commits analyse byte-identical audio. The signal is a harmonic
+"voice" built from steady notes, glides between notes, vibrato and silence
+gaps, written to WAV in small blocks so even the 60 minute fixture never has
+to be held in memory at once.
+
+Mixture fixtures put the same voice over an accompaniment (bass, drums or
+sustained chords). They are not vocal-only, and exist so the vocal-only
+detector is checked in both directions.
+"""
+import json
+from pathlib import Path
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+FIXTURE_VERSION = 1
+FIXTURE_SR = 44100
+
+# name -> length in seconds
+FIXTURE_LENGTHS = {
+    "30s": 30,
+    "4min": 4 * 60,
+    "60min": 60 * 60,
+}
+
+DEFAULT_FIXTURE_DIR = Path(__file__).resolve().parent / ".fixtures"
+
+# Relative amplitudes of the harmonics, roughly a sung vowel
+HARMONICS = np.array([1.0, 0.55, 0.35, 0.22, 0.12, 0.08])
+
+ACCOMPANIMENTS = ("bass", "drums", "chords")
+
+# 120 bpm in 4/4, one chord per bar
+BEAT_SEC = 0.5
+BAR_SEC = 4 * BEAT_SEC
+# I-V-vi-IV as (root, third, fifth) MIDI notes around C4
+PROGRESSION = [(60, 64, 67), (55, 59, 62), (57, 60, 64), (53, 57, 60)]
+
+
+def midi_to_hz(midi):
+    return 440.0 * 2.0 ** ((np.asarray(midi, dtype=float) - 69) / 12)
+
+
+def _envelope(n, sr, attack=0.03, release=0.05):
+    """Linear attack/release so note edges are not clicks."""
+    env = np.ones(n)
+    a = min(int(attack * sr), n // 2)
+    r = min(int(release * sr), n // 2)
+    if a:
+        env[:a] = np.linspace(0.0, 1.0, a)
+    if r:
+        env[-r:] = np.linspace(1.0, 0.0, r)
+    return env
+
+
+def _render(freqs, sr, amplitude):
+    """Render a per-sample frequency curve as a harmonic tone."""
+    phase = 2 * np.pi * np.cumsum(freqs) / sr
+    tone = np.zeros_like(freqs)
+    for k, weight in enumerate(HARMONICS, start=1):
+        # drop harmonics above Nyquist instead of aliasing them
+        tone += weight * np.sin(k * phase) * (k * freqs < sr / 2)
+    tone /= HARMONICS.sum()
+    return amplitude * tone * _envelope(len(freqs), sr)
+
+
+def _events(rng, sr, total_samples):
+    """
+    Yield (kind, samples) blocks until total_samples have been produced.
+    kind is one of "steady", "glide", "vibrato" or "silence".
+    """
+    produced = 0
+    midi = rng.integers(55, 76)
+
+    while produced < total_samples:
+        kind = rng.choice(["steady", "glide", "vibrato", "silence"],
+                          p=[0.35, 0.2, 0.25, 0.2])
+
+        if kind == "silence":
+            n = int(rng.uniform(0.2, 1.0) * sr)
+            block = np.zeros(n)
+        else:
+            n = int(rng.uniform(0.3, 2.0) * sr)
+            t = np.arange(n) / sr
+            amplitude = rng.uniform(0.2, 0.6)
+
+            if kind == "steady":
+                freqs = np.full(n, midi_to_hz(midi))
+            elif kind == "glide":
+                target = int(np.clip(midi + rng.integers(-7, 8), 50, 80))
+                freqs = midi_to_hz(np.linspace(midi, target, n))
+                midi = target
+            else:
+                rate = rng.uniform(4.5, 6.5)
+                depth_cents = rng.uniform(20, 60)
+                cents = depth_cents * np.sin(2 * np.pi * rate * t)
+                freqs = midi_to_hz(midi) * 2.0 ** (cents / 1200)
+
+            block = _render(freqs, sr, amplitude)
+            midi = int(np.clip(midi + rng.integers(-4, 5), 50, 80))
+
+        # breath noise everywhere, including the gaps
+        block = block + rng.normal(0.0, 0.003, n)
+
+        n = min(n, total_samples - produced)
+        produced += n
+        yield kind, block[:n]
+
+
+def _tone(t, freq, weights):
+    """Harmonic tone at a fixed frequency over local times t."""
+    return sum(w * np.sin(2 * np.pi * k * freq * t)
+               for k, w in enumerate(weights, start=1))
+
+
+def _bass(t, bar, beat, rng):
+    # root of the bar's chord, one plucked note per beat, 41-78 Hz
+    midi = 28 + PROGRESSION[bar % len(PROGRESSION)][0] % 12
+    return 0.3 * _tone(t, midi_to_hz(midi), [1.0, 0.5, 0.25]) * np.exp(-3 * t)
+
+
+def _drums(t, bar, beat, rng):
+    hit = np.zeros_like(t)
+    if beat % 2 == 0:
+        # kick: a fast downward sweep from 110 Hz to 50 Hz
+        phase = 2 * np.pi * (50 * t + 2 * (1 - np.exp(-t * 30)))
+        hit += 0.4 * np.sin(phase) * np.exp(-t * 12)
+    else:
+        # snare: noise burst over a 180 Hz body
+        hit += (0.2 * rng.normal(0.0, 1.0, len(t)) + 0.2 * np.sin(2 * np.pi * 180 * t)) * np.exp(-t * 18)
+    # closed hi-hat on the off-beat eighth, differentiated noise is mostly treble
+    off = t - BEAT_SEC / 2
+    hat = np.diff(rng.normal(0.0, 1.0, len(t) + 1)) * np.exp(-np.clip(off, 0, None) * 120)
+    hit += 0.05 * hat * (off >= 0)
+    return hit
+
+
+def _chords(t, bar, beat, rng):
+    # a sustained pad: the whole bar's triad, held across the four beats
+    if beat:
+        return np.zeros_like(t)
+    chord = PROGRESSION[bar % len(PROGRESSION)]
+    pad = sum(_tone(t, midi_to_hz(m), HARMONICS) for m in chord) / HARMONICS.sum()
+    fade = np.clip(np.minimum(t, BAR_SEC - t) / 0.1, 0.0, 1.0)
+    return 0.2 * pad * fade
+
+
+ACCOMPANIMENT_PARTS = {"bass": _bass, "drums": _drums, "chords": _chords}
+
+
+def _accompaniment(kind, seed, start, n, sr):
+    """
+    Render samples start..start+n of an accompaniment track. Every beat is
+    rendered whole from its own onset with its own seeded noise, so the result
+    does not depend on how the track is split into blocks.
+    """
+    part = ACCOMPANIMENT_PARTS[kind]
+    out = np.zeros(n)
+    # chords last a bar, everything else decays within one
+    length = BAR_SEC if kind == "chords" else BEAT_SEC
+    beat_n = int(BEAT_SEC * sr)
+    length_n = int(length * sr)
+
+    first = max(0, (start - length_n) // beat_n)
+    last = (start + n) // beat_n
+    for index in range(first, last + 1):
+        onset = index * beat_n
+        lo, hi = max(onset, start), min(onset + length_n, start + n)
+        if lo >= hi:
+            continue
+        t = np.arange(length_n) / sr
+        event = part(t, index // 4, index % 4, np.random.default_rng([seed, index]))
+        out[lo - start:hi - start] += event[lo - onset:hi - onset]
+    return out
+
+
+def generate_fixture(path, seconds, seed=0, sr=FIXTURE_SR, accompaniment=None):
+    """
+    Write a synthetic vocal fixture to path and return its event counts.
+    accompaniment (one of ACCOMPANIMENTS) is mixed under the same voice.
+    """
+    rng = np.random.default_rng(seed)
+    counts = {"steady": 0, "glide": 0, "vibrato": 0, "silence": 0}
+    produced = 0
+
+    with sf.SoundFile(str(path), mode="w", samplerate=sr, channels=1,
+                      subtype="PCM_16") as out:
+        for kind, block in _events(rng, sr, int(seconds * sr)):
+            counts[kind] += 1
+            if accompaniment:
+                block = block + _accompaniment(
+                    accompaniment, seed, produced, len(block), sr)
+            produced += len(block)
+            out.write(np.clip(block, -1.0, 1.0).astype(np.float32))
+
+    return counts
+
+
+def get_fixture(name, fixture_dir=DEFAULT_FIXTURE_DIR, seed=0, accompaniment=None):
+    """
+    Return (path, metadata) for a named fixture, generating it on first use.
+    With accompaniment, the fixture is the same voice mixed over it and is
+    named e.g. "30s+chords". Generated files are cached on disk keyed by name,
+    accompaniment, seed and FIXTURE_VERSION.
+    """
+    if name not in FIXTURE_LENGTHS:
+        raise ValueError(
+            f"Unknown fixture '{name}', expected one of {list(FIXTURE_LENGTHS)}")
+    if accompaniment is not None and accompaniment not in ACCOMPANIMENTS:
+        raise ValueError(
+            f"Unknown accompaniment '{accompaniment}', expected one of {list(ACCOMPANIMENTS)}")
+
+    fixture_dir = Path(fixture_dir)
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+
+    variant = f"{name}_{accompaniment}" if accompaniment else name
+    stem = f"synth_{variant}_s{seed}_v{FIXTURE_VERSION}"
+    wav_path = fixture_dir / f"{stem}.wav"
+    meta_path = fixture_dir / f"{stem}.json"
+
+    if wav_path.exists() and meta_path.exists():
+        return wav_path, json.loads(meta_path.read_text())
+
+    seconds = FIXTURE_LENGTHS[name]
+    counts = generate_fixture(wav_path, seconds, seed=seed, accompaniment=accompaniment)
+    metadata = {
+        "name": f"{name}+{accompaniment}" if accompaniment else name,
+        "kind": "synthetic",
+        "duration_sec": seconds,
+        "seed": seed,
+        "version": FIXTURE_VERSION,
+        "accompaniment": accompaniment,
+        "events": counts,
+    }
+    meta_path.write_text(json.dumps(metadata, indent=2))
+    return wav_path, metadata
+
+
+def get_stem(path):
+    """Return (path, metadata) for a real vocal stem supplied by the user."""
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Stem not found: {path}")
+
+    duration = librosa.get_duration(path=str(path))
+    return path, {
+        "name": path.stem,
+        "kind": "stem",
+        "duration_sec": round(duration, 3),
+    }
@@ -0,0 +1,353 @@
+"""
+Local stand-ins for the external services the API depends on:
+
+- Supabase auth     GET  /auth/v1/user
+- Supabase REST     GET  /rest/v1/audio_analyses   (eq filters, order, limit, select)
+                    POST /rest/v1/audio_analyses
+- YouTube Data API  GET  /youtube/v3/videos
+                    GET  /youtube/v3/search
+
+Everything is kept in memory and every request can be delayed by a
+configurable latency (plus jitter) or failed at a configurable rate, per
+service. Any bearer token of the form "loadtest-user-<n>" is accepted; the
+token "expired" is rejected the way Supabase rejects an expired JWT.
+
+Run it on its own to point a manually started API at it:
+
+    python fake_backend.py --port 54321 --auth-latency-ms 40
+    SUPABASE_URL=http://127.0.0.1:54321 YOUTUBE_API_BASE=http://127.0.0.1:54321/youtube/v3 ...
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SERVICES = ("auth", "rest", "youtube")
+
+TOKEN_PREFIX = "loadtest-user-"
+
+NOTE_NAMES = ["C4", "D4", "E4", "F4", "G4", "A4", "B4", "C5"]
+
+
+def token_for(n):
+    return f"{TOKEN_PREFIX}{n}"
+
+
+def user_id_for(token):
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"loadtest/{token}"))
+
+
+def fake_notes(count, seed=0):
+    """A notes payload shaped like get_segmented_vocal_notes output."""
+    rng = random.Random(seed)
+    notes = []
+    t = 0.0
+    for _ in range(count):
+        duration = round(rng.uniform(0.1, 1.2), 3)
+        freq = round(rng.uniform(130, 520), 2)
+        notes.append({
+            "start": round(t, 3),
+            "end": round(t + duration, 3),
+            "duration": duration,
+            "note": rng.choice(NOTE_NAMES),
+            "freq": freq,
+        })
+        t += duration + rng.uniform(0.0, 0.4)
+    return notes
+
+
+def fake_video_id(n):
+    return f"vid{n:08d}"[:11]
+
+
+class FakeBackend:
+    """
+    In-memory Supabase + YouTube stub served over local HTTP.
+
+    latency maps a service name ("auth", "rest", "youtube") to
+    (base_ms, jitter_ms); fail_rate maps it to a probability of answering 503.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=None, fail_rate=None, seed=0):
+        self.latency = {name: (0.0, 0.0) for name in SERVICES}
+        self.latency.update(latency or {})
+        self.fail_rate = {name: 0.0 for name in SERVICES}
+        self.fail_rate.update(fail_rate or {})
+
+        self.rows = []
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.request_counts = {name: 0 for name in SERVICES}
+
+        handler = type("Handler", (_Handler,), {"backend": self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def seed_analyses(self, users, per_user, notes_per_analysis):
+        """
+        Insert per_user saved analyses for users "loadtest-user-0..users-1".
+        Returns {token: [(analysis_id, original_url), ...]}.
+        """
+        seeded = {}
+        start = datetime.now(timezone.utc) - timedelta(days=1)
+        for u in range(users):
+            token = token_for(u)
+            seeded[token] = []
+            for i in range(per_user):
+                video_id = fake_video_id(u * per_user + i)
+                row = self.insert({
+                    "user_id": user_id_for(token),
+                    "original_url": f"https://www.youtube.com/watch?v={video_id}",
+                    "video_id": video_id,
+                    "vocals_url": f"/files/{user_id_for(token)}/{video_id}.mp3",
+                    "notes": fake_notes(notes_per_analysis, seed=u * per_user + i),
+                }, created_at=start + timedelta(minutes=u * per_user + i))
+                seeded[token].append((row["id"], row["original_url"]))
+        return seeded
+
+    def insert(self, values, created_at=None):
+        row = dict(values)
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", (created_at or datetime.now(timezone.utc)).isoformat())
+        with self.lock:
+            self.rows.append(row)
+        return row
+
+    def query(self, filters, order=None, limit=None):
+        with self.lock:
+            rows = [r for r in self.rows
+                    if all(str(r.get(col)) == val for col, val in filters.items())]
+        if order:
+            column, _, direction = order.partition(".")
+            rows.sort(key=lambda r: str(r.get(column)),
+                      reverse=direction.startswith("desc"))
+        if limit is not None:
+            rows = rows[:limit]
+        return rows
+
+    def simulate(self, service):
+        """Apply the configured latency; returns False if the call should fail."""
+        with self.lock:
+            self.request_counts[service] += 1
+            base_ms, jitter_ms = self.latency[service]
+            delay = max(0.0, base_ms + self.rng.uniform(-jitter_ms, jitter_ms))
+            failed = self.rng.random() < self.fail_rate[service]
+        if delay:
+            time.sleep(delay / 1000)
+        return not failed
+
+
+class _Handler(BaseHTTPRequestHandler):
+    backend = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _service(self, path):
+        if path.startswith("/auth/"):
+            return "auth"
+        if path.startswith("/rest/"):
+            return "rest"
+        if path.startswith("/youtube/"):
+            return "youtube"
+        return None
+
+    def _handle(self, method):
+        parsed = urlparse(self.path)
+        service = self._service(parsed.path)
+        if service is None:
+            return self._send(404, {"message": f"No stub for {parsed.path}"})
+
+        body = None
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = json.loads(self.rfile.read(length))
+
+        if not self.backend.simulate(service):
+            return self._send(503, {"message": "injected failure", "code": 503})
+
+        query = parse_qs(parsed.query, keep_blank_values=True)
+
+        if service == "auth" and parsed.path == "/auth/v1/user" and method == "GET":
+            return self._auth_user()
+        if service == "rest" and parsed.path == "/rest/v1/audio_analyses":
+            if method == "GET":
+                return self._rest_select(query)
+            if method == "POST":
+                return self._rest_insert(body)
+        if service == "youtube" and parsed.path == "/youtube/v3/videos":
+            return self._youtube_videos(query)
+        if service == "youtube" and parsed.path == "/youtube/v3/search":
+            return self._youtube_search(query)
+
+        return self._send(404, {"message": f"No stub for {method} {parsed.path}"})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    # --- Supabase auth
+
+    def _auth_user(self):
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not token.startswith(TOKEN_PREFIX):
+            return self._send(403, {
+                "code": 403,
+                "error_code": "bad_jwt",
+                "msg": "invalid JWT: unable to parse or verify signature, token has expired",
+            })
+
+        return self._send(200, {
+            "id": user_id_for(token),
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": f"{token}@loadtest.local",
+            "app_metadata": {"provider": "email"},
+            "user_metadata": {},
+            "created_at": "2024-01-01T00:00:00+00:00",
+        })
+
+    # --- Supabase PostgREST
+
+    def _rest_select(self, query):
+        filters = {}
+        for column, values in query.items():
+            if column in ("select", "order", "limit", "offset"):
+                continue
+            value = values[0]
+            if not value.startswith("eq."):
+                return self._send(400, {"message": f"Unsupported filter {column}={value}"})
+            filters[column] = value[3:]
+
+        limit = int(query["limit"][0]) if "limit" in query else None
+        order = query["order"][0] if "order" in query else None
+        rows = self.backend.query(filters, order=order, limit=limit)
+
+        columns = query.get("select", ["*"])[0]
+        if columns != "*":
+            wanted = [c.strip() for c in columns.split(",")]
+            rows = [{c: r.get(c) for c in wanted} for r in rows]
+
+        return self._send(200, rows, {"Content-Range": f"0-{max(len(rows) - 1, 0)}/*"})
+
+    def _rest_insert(self, body):
+        values = body if isinstance(body, list) else [body]
+        rows = [self.backend.insert(v) for v in values]
+        return self._send(201, rows)
+
+    # --- YouTube Data API
+
+    def _snippet(self, video_id):
+        return {
+            "title": f"Load test video {video_id}",
+            "channelTitle": "Load Test Channel",
+            "description": "Synthetic video served by the load test stub.",
+            "thumbnails": {
+                "default": {"url": f"https://i.ytimg.com/vi/{video_id}/default.jpg"},
+                "medium": {"url": f"https://i.ytimg.com/vi/{video_id}/mqdefault.jpg"},
+            },
+        }
+
+    def _youtube_videos(self, query):
+        ids = [i for i in query.get("id", [""])[0].split(",") if i]
+        items = [{
+            "kind": "youtube#video",
+            "id": video_id,
+            "snippet": self._snippet(video_id),
+            "contentDetails": {"duration": "PT3M30S"},
+        } for video_id in ids]
+        return self._send(200, {"kind": "youtube#videoListResponse", "items": items})
+
+    def _youtube_search(self, query):
+        q = query.get("q", [""])[0]
+        max_results = int(query.get("maxResults", ["5"])[0])
+        items = []
+        for n in range(max_results):
+            video_id = fake_video_id(zlib.crc32(f"{q}/{n}".encode()) % 10**8)
+            items.append({
+                "kind": "youtube#searchResult",
+                "id": {"kind": "youtube#video", "videoId": video_id},
+                "snippet": self._snippet(video_id),
+            })
+        return self._send(200, {"kind": "youtube#searchListResponse", "items": items})
+
+
+def latency_args(parser):
+    """Shared CLI flags for latency and failure injection."""
+    for service in SERVICES:
+        parser.add_argument(f"--{service}-latency-ms", type=float, default=0.0,
+                            help=f"added latency for {service} calls")
+        parser.add_argument(f"--{service}-fail-rate", type=float, default=0.0,
+                            help=f"fraction of {service} calls answered with 503")
+    parser.add_argument("--jitter-ms", type=float, default=0.0,
+                        help="uniform +/- jitter added to every latency")
+
+
+def latency_from_args(args):
+    latency = {s: (getattr(args, f"{s}_latency_ms"), args.jitter_ms) for s in SERVICES}
+    fail_rate = {s: getattr(args, f"{s}_fail_rate") for s in SERVICES}
+    return latency, fail_rate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Supabase/YouTube stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--analyses-per-user", type=int, default=5)
+    parser.add_argument("--notes", type=int, default=400,
+                        help="notes per seeded analysis")
+    latency_args(parser)
+    args = parser.parse_args(argv)
+
+    latency, fail_rate = latency_from_args(args)
+    backend = FakeBackend(args.host, args.port, latency, fail_rate)
+    backend.seed_analyses(args.users, args.analyses_per_user, args.notes)
+
+    print(f"Fake backend on {backend.url}")
+    print(f"  SUPABASE_URL={backend.url}")
+    print(f"  YOUTUBE_API_BASE={backend.url}/youtube/v3")
+    print(f"  tokens: {token_for(0)} .. {token_for(args.users - 1)}")
+    try:
+        backend.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Load generator for the API with every external dependency replaced.
+
+Starts the fake Supabase/YouTube backend, boots app/main.py in-process under
+uvicorn pointed at it, swaps download/separation for timed stand-ins (so
+/audio/process exercises the task, SSE and result plumbing without yt-dlp or
+the MDX model) and then drives the routes at a fixed arrival rate.
+
+    python run_load.py --rps 20 --duration 30
+    python run_load.py --rps 50 --auth-latency-ms 40 --rest-latency-ms 25 \\
+        --youtube-latency-ms 120 --jitter-ms 10 --output results.json
+
+Scenarios and their default weights (--mix name=weight,...):
+
+    process         POST /audio/process for a new URL, follow the SSE progress
+                    stream to "done", then GET /audio/result and /audio/saved_result
+    process_cached  POST /audio/process for an already analysed URL
+    saved_result    GET /audio/saved_result/{id}
+    sidebar         GET /audio/sidebar_recent
+
+Requests are issued open-loop: arrivals do not wait for earlier responses, so
+a saturated server shows up as growing latency and errors instead of a
+silently lower request rate.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import uvicorn
+
+LOADTEST_DIR = Path(__file__).resolve().parent
+APP_DIR = LOADTEST_DIR.parent / "app"
+
+sys.path.insert(0, str(LOADTEST_DIR))
+
+from fake_backend import FakeBackend, fake_notes, latency_args, latency_from_args  # noqa: E402
+
+DEFAULT_MIX = {"process": 1, "process_cached": 2, "saved_result": 4, "sidebar": 3}
+
+
+def import_main(backend):
+    """Import app/main.py with its Supabase and YouTube URLs aimed at the stub."""
+    os.environ["SUPABASE_URL"] = backend.url
+    os.environ["SUPABASE_ANON_KEY"] = "loadtest.anon.key"
+    os.environ["SUPABASE_SERVICE_ROLE"] = "loadtest.service.key"
+    os.environ["YOUTUBE_API_KEY"] = "loadtest"
+    os.environ["YOUTUBE_API_BASE"] = f"{backend.url}/youtube/v3"
+
+    if str(APP_DIR) not in sys.path:
+        sys.path.insert(0, str(APP_DIR))
+
+    import main
+    return main
+
+
+def stub_pipeline(main, output_dir, download_ms, separate_ms, notes):
+    """
+    Replace the CPU/network heavy steps of process_audio_task with sleeps.
+    process_audio_task looks these names up at call time, so patching the
+    module attributes is enough.
+    """
+    main.AUDIO_OUTPUT_DIR = Path(output_dir).resolve()
+
+    def download_audio(url, uid):
+        time.sleep(download_ms / 1000)
+        return f"loadtest/{uid}/{uuid.uuid4()}.mp3"
+
+    def separate_voiceline(input_path, uid, quality=main.DEFAULT_SEPARATION_TIER):
+        time.sleep(separate_ms / 1000)
+        user_dir = main.AUDIO_OUTPUT_DIR / uid
+        user_dir.mkdir(parents=True, exist_ok=True)
+        vocals_path = user_dir / f"{uuid.uuid4()}.mp3"
+        vocals_path.touch()
+        return {"status": "done", "vocals_path": str(vocals_path),
+                "notes": fake_notes(notes)}
+
+    def detect_vocal_only(input_path):
+        return {"vocal_only": False, "reason": "load test stub"}
+
+    main.download_audio = download_audio
+    main.detect_vocal_only = detect_vocal_only
+    main.separate_voiceline = separate_voiceline
+
+
+def start_api(app, host, port):
+    config = uvicorn.Config(app, host=host, port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    deadline = time.time() + 15
+    while not server.started:
+        if time.time() > deadline or not thread.is_alive():
+            raise RuntimeError(f"API did not start on {host}:{port}")
+        time.sleep(0.05)
+    return server, thread
+
+
+class Recorder:
+    """Collects (endpoint, latency, ok, status) samples."""
+
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, endpoint, latency, ok, status=None):
+        self.samples.setdefault(endpoint, []).append((latency, ok, status))
+
+    async def timed(self, endpoint, request, expected=(200,)):
+        start = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError as e:
+            self.add(endpoint, time.perf_counter() - start, False, type(e).__name__)
+            return None
+        self.add(endpoint, time.perf_counter() - start,
+                 response.status_code in expected, response.status_code)
+        return response
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    # nearest-rank
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(recorder, elapsed):
+    summary = {}
+    for endpoint, samples in sorted(recorder.samples.items()):
+        latencies = sorted(s[0] for s in samples)
+        errors = [s for s in samples if not s[1]]
+        statuses = {}
+        for _, _, status in errors:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+        summary[endpoint] = {
+            "count": len(samples),
+            "rps": round(len(samples) / elapsed, 2) if elapsed else None,
+            "errors": len(errors),
+            "error_rate": round(len(errors) / len(samples), 4),
+            "error_statuses": statuses,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p90_ms": round(percentile(latencies, 90) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1),
+        }
+    return summary
+
+
+class Scenarios:
+    def __init__(self, client, recorder, seeded, rng):
+        self.client = client
+        self.recorder = recorder
+        self.seeded = seeded
+        self.tokens = list(seeded)
+        self.rng = rng
+
+    def _user(self):
+        token = self.rng.choice(self.tokens)
+        return token, {"Authorization": f"Bearer {token}"}
+
+    async def process(self):
+        token, headers = self._user()
+        url = f"https://www.youtube.com/watch?v=lt{uuid.uuid4().hex[:9]}"
+
+        response = await self.recorder.timed("POST /audio/process", self.client.post(
+            "/audio/process", json={"url": url}, headers=headers))
+        if response is None or response.status_code != 200:
+            return
+        task_id = response.json()["task_id"]
+
+        # time from subscribing until the stream reports a final state
+        start = time.perf_counter()
+        final = None
+        try:
+            async with self.client.stream("GET", f"/audio/progress/{task_id}") as stream:
+                async for line in stream.aiter_lines():
+                    if line.startswith("data: "):
+                        final = line[len("data: "):]
+                        if final in ("done", "error"):
+                            break
+        except httpx.HTTPError as e:
+            self.recorder.add("SSE /audio/progress", time.perf_counter() - start,
+                              False, type(e).__name__)
+            return
+        self.recorder.add("SSE /audio/progress", time.perf_counter() - start,
+                          final == "done", final)
+        if final != "done":
+            return
+
+        response = await self.recorder.timed("GET /audio/result", self.client.get(
+            f"/audio/result/{task_id}", headers=headers))
+        if response is None or response.status_code != 200:
+            return
+
+        await self.recorder.timed("GET /audio/saved_result", self.client.get(
+            f"/audio/saved_result/{response.json()['supabase_id']}", headers=headers))
+
+    async def process_cached(self):
+        token, headers = self._user()
+        _, url = self.rng.choice(self.seeded[token])
+        await self.recorder.timed("POST /audio/process (cached)", self.client.post(
+            "/audio/process", json={"url": url}, headers=headers))
+
+    async def saved_result(self):
+        token, headers = self._user()
+        analysis_id, _ = self.rng.choice(self.seeded[token])
+        await self.recorder.timed("GET /audio/saved_result", self.client.get(
+            f"/audio/saved_result/{analysis_id}", headers=headers))
+
+    async def sidebar(self):
+        _, headers = self._user()
+        await self.recorder.timed("GET /audio/sidebar_recent", self.client.get(
+            "/audio/sidebar_recent", params={"limit": 5}, headers=headers))
+
+
+async def drive(base_url, seeded, mix, rps, duration, timeout, seed):
+    rng = random.Random(seed)
+    recorder = Recorder()
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    total = int(rps * duration)
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        scenarios = Scenarios(client, recorder, seeded, rng)
+        tasks = []
+        lag = 0.0
+        start = time.perf_counter()
+
+        for i in range(total):
+            due = start + i / rps
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                lag = max(lag, -delay)
+            name = rng.choices(names, weights)[0]
+            tasks.append(asyncio.create_task(getattr(scenarios, name)()))
+
+        issue_elapsed = time.perf_counter() - start
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return recorder, issue_elapsed, elapsed, lag
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise SystemExit(f"Unknown scenario '{name}', expected one of {list(DEFAULT_MIX)}")
+        mix[name] = float(weight or 1)
+    return {n: w for n, w in mix.items() if w > 0}
+
+
+def print_report(summary, args, issue_elapsed, elapsed, lag, backend):
+    print(f"\nTarget {args.rps} scenarios/s for {args.duration}s "
+          f"(issued in {issue_elapsed:.1f}s, drained in {elapsed:.1f}s, max issue lag {lag * 1000:.0f} ms)")
+    print(f"\n{'endpoint':<32} {'count':>6} {'rps':>7} {'err%':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for endpoint, row in summary.items():
+        print(f"{endpoint:<32} {row['count']:>6} {row['rps']:>7} {row['error_rate'] * 100:>6.1f} "
+              f"{row['p50_ms']:>8} {row['p90_ms']:>8} {row['p99_ms']:>8} {row['max_ms']:>8}")
+        if row["error_statuses"]:
+            print(f"{'':<32} errors: {row['error_statuses']}")
+    print(f"\nstub calls: {backend.request_counts}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Drive the API at a target rate against local Supabase/YouTube stubs.")
+    parser.add_argument("--rps", type=float, default=10,
+                        help="scenarios started per second")
+    parser.add_argument("--duration", type=float, default=30,
+                        help="seconds to keep starting scenarios")
+    parser.add_argument("--mix", default=",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+                        help="scenario weights, e.g. process=1,sidebar=3")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--analyses-per-user", type=int, default=5)
+    parser.add_argument("--notes", type=int, default=400,
+                        help="notes per analysis payload")
+    parser.add_argument("--download-ms", type=float, default=200,
+                        help="simulated download time per processed URL")
+    parser.add_argument("--separate-ms", type=float, default=1000,
+                        help="simulated separation + analysis time per processed URL")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true",
+                        help="keep the API's INFO logging")
+    parser.add_argument("--output", default=None, help="write the summary as JSON")
+    latency_args(parser)
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    latency, fail_rate = latency_from_args(args)
+
+    backend = FakeBackend(latency=latency, fail_rate=fail_rate, seed=args.seed).start()
+    seeded = backend.seed_analyses(args.users, args.analyses_per_user, args.notes)
+
+    main_module = import_main(backend)
+    if not args.verbose:
+        logging.getLogger("audio-api").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        stub_pipeline(main_module, output_dir, args.download_ms, args.separate_ms, args.notes)
+        server, thread = start_api(main_module.app, args.host, args.port)
+
+        try:
+            recorder, issue_elapsed, elapsed, lag = asyncio.run(drive(
+                f"http://{args.host}:{args.port}", seeded, mix,
+                args.rps, args.duration, args.timeout, args.seed))
+        finally:
+            server.should_exit = True
+            thread.join(timeout=10)
+            backend.stop()
+
+    summary = summarize(recorder, issue_elapsed)
+    print_report(summary, args, issue_elapsed, elapsed, lag, backend)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "config": {k: v for k, v in vars(args).items() if k != "output"},
+            "mix": mix,
+            "issue_elapsed_sec": round(issue_elapsed, 3),
+            "elapsed_sec": round(elapsed, 3),
+            "max_issue_lag_ms": round(lag * 1000, 1),
+            "stub_calls": backend.request_counts,
+            "endpoints": summary,
+        }, indent=2))
+        print(f"Saved summary to {args.output}")
+
+
+if __name__ == "__main__":
+    main()